@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class UserBase(BaseModel):
@@ -11,10 +11,9 @@ class UserBase(BaseModel):
 
 
 class UserRead(UserBase):
-    user_id: int
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+    user_id: int
 
 
 class TweetBase(BaseModel):
@@ -30,10 +29,9 @@ class TweetCreate(TweetBase):
 
 
 class TweetRead(TweetBase):
-    tweet_id: int
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+    tweet_id: int
 
 
 class FullTweetRead(TweetRead):
@@ -47,10 +45,9 @@ class BioBase(BaseModel):
 
 
 class BioRead(BioBase):
-    user_id: int
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+    user_id: int
 
 
 class UserCreate(UserBase):
@@ -58,12 +55,11 @@ class UserCreate(UserBase):
 
 
 class ProfileRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     user: UserRead
     bio: BioRead
 
-    class Config:
-        orm_mode = True
-
 
-UserRead.update_forward_refs()
-TweetRead.update_forward_refs()
+UserRead.model_rebuild()
+TweetRead.model_rebuild()
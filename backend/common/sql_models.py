@@ -3,6 +3,7 @@ import datetime
 from sqlalchemy import (
     CheckConstraint,
     Column,
+    Index,
     Integer,
     String,
     DateTime,
@@ -23,8 +24,18 @@ class Base(AsyncAttrs, DeclarativeBase):
 followers_association = Table(
     "followers",
     Base.metadata,
-    Column("follower_id", Integer, ForeignKey("users.user_id"), primary_key=True),
-    Column("followed_id", Integer, ForeignKey("users.user_id"), primary_key=True),
+    Column(
+        "follower_id",
+        Integer,
+        ForeignKey("users.user_id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "followed_id",
+        Integer,
+        ForeignKey("users.user_id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
 )
 
 
@@ -33,7 +44,7 @@ class Tweet(Base):
     __table_args__ = (CheckConstraint("views >= 0", name="check_views_non_negative"),)
 
     tweet_id = Column(Integer, primary_key=True, autoincrement=True)
-    author_id = Column(Integer, ForeignKey("users.user_id"))
+    author_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"))
     text = Column(Text)
     fake_time = Column(DateTime, default=lambda: to_fake(datetime.datetime.utcnow()))
     real_time = Column(DateTime, default=datetime.datetime.utcnow)
@@ -43,6 +54,16 @@ class Tweet(Base):
     quoted_tweet = relationship("Tweet", remote_side=[tweet_id])
 
 
+# matches the ORDER BY of the timeline and posts queries, so Postgres can
+# satisfy ORDER BY ... LIMIT with an index range scan instead of a sort
+Index(
+    "idx_tweets_author_time",
+    Tweet.author_id,
+    Tweet.fake_time.desc().nulls_last(),
+    Tweet.tweet_id.desc(),
+)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -58,7 +79,9 @@ class User(Base):
 class Bio(Base):
     __tablename__ = "bios"
 
-    user_id = Column(Integer, ForeignKey("users.user_id"), primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True
+    )
     content = Column(Text, default="")
     location = Column(String, default="Earth")
 
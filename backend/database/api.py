@@ -1,4 +1,8 @@
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
+import functools
+import logging
 import os
 from typing import List, Optional
 
@@ -6,12 +10,17 @@ import fastapi
 import modal
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 import common
 
 
 image = modal.Image.debian_slim(python_version="3.11").pip_install(
-    "asyncpg==0.29.0", "sqlalchemy[asyncio]==2.0.30"
+    "asyncpg==0.29.0",
+    "fastapi==0.111.0",  # pin past 0.96 for the cached clone_field fast startup
+    "fastapi-cache2==0.2.1",
+    "orjson==3.10.3",
+    "sqlalchemy[asyncio]==2.0.30",
 )
 
 
@@ -22,10 +31,116 @@ app = modal.App(
 )
 
 
+@functools.lru_cache(maxsize=1)
+def get_engine():
+    """Build the async engine once per container.
+
+    The pool -- and asyncpg's prepared-statement cache with it -- lives as
+    long as the container, even if the ASGI factory runs again."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    if not os.environ.get("SQL_ECHO"):  # keep SQL off the hot path by default
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+    user = os.environ["PGUSER"]
+    password = os.environ["PGPASSWORD"]
+    host = os.environ["PGHOST"]
+    port = os.environ["PGPORT"]
+    database = os.environ["PGDATABASE"]
+
+    connection_string = (
+        f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{database}"
+    )
+
+    return create_async_engine(
+        connection_string,
+        isolation_level="READ COMMITTED",  # default and lowest level in pgSQL
+        echo=bool(os.environ.get("SQL_ECHO")),  # log SQL as it is emitted
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=50,  # with max_overflow, sized to allow_concurrent_inputs
+        max_overflow=50,
+        pool_recycle=1800,  # with keepalives, stands in for per-checkout pre-ping
+        pool_timeout=10,
+        query_cache_size=1200,  # keep every query's compiled SQL warm
+        connect_args={
+            "server_settings": {
+                "jit": "off",  # JIT hurts short OLTP queries
+                # catch dead peers at the TCP layer instead of paying a
+                # SELECT 1 on every pool checkout
+                "tcp_keepalives_idle": "60",
+                "tcp_keepalives_interval": "10",
+                "tcp_keepalives_count": "3",
+            },
+            "prepared_statement_cache_size": 1024,
+        },
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_session_maker():
+    """Build the session factory once per container, on first use."""
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+
+    return sessionmaker(
+        bind=get_engine(), class_=AsyncSession, expire_on_commit=False
+    )
+
+
+@app.function(mounts=[common.mount])
+async def migrate():
+    """Bring an already-deployed database in line with common/sql_models.py.
+
+    create_all only creates missing tables, so foreign-key and index changes
+    have to be applied to existing schemas here:
+
+        modal run database.api::migrate
+    """
+    from sqlalchemy.sql import text
+
+    statements = [
+        # recreate the user-referencing foreign keys with ON DELETE CASCADE;
+        # the constraint names are the Postgres defaults
+        "ALTER TABLE tweets DROP CONSTRAINT IF EXISTS tweets_author_id_fkey",
+        "ALTER TABLE tweets ADD CONSTRAINT tweets_author_id_fkey"
+        " FOREIGN KEY (author_id) REFERENCES users (user_id) ON DELETE CASCADE",
+        "ALTER TABLE followers DROP CONSTRAINT IF EXISTS followers_follower_id_fkey",
+        "ALTER TABLE followers ADD CONSTRAINT followers_follower_id_fkey"
+        " FOREIGN KEY (follower_id) REFERENCES users (user_id) ON DELETE CASCADE",
+        "ALTER TABLE followers DROP CONSTRAINT IF EXISTS followers_followed_id_fkey",
+        "ALTER TABLE followers ADD CONSTRAINT followers_followed_id_fkey"
+        " FOREIGN KEY (followed_id) REFERENCES users (user_id) ON DELETE CASCADE",
+        "ALTER TABLE bios DROP CONSTRAINT IF EXISTS bios_user_id_fkey",
+        "ALTER TABLE bios ADD CONSTRAINT bios_user_id_fkey"
+        " FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE",
+    ]
+
+    # built CONCURRENTLY so the live tweets table isn't write-locked for the
+    # duration; that rules out running inside a transaction, so it goes on an
+    # autocommit connection after the constraint changes commit
+    index_statement = (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tweets_author_time"
+        " ON tweets (author_id, fake_time DESC NULLS LAST, tweet_id DESC)"
+    )
+
+    engine = get_engine()
+    async with engine.begin() as conn:
+        for statement in statements:
+            print(statement)
+            await conn.execute(text(statement))
+
+    autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+    async with autocommit_engine.connect() as conn:
+        print(index_statement)
+        await conn.execute(text(index_statement))
+
+    await engine.dispose()
+
+
 @app.function(
     keep_warm=1,
-    allow_concurrent_inputs=1000,
-    concurrency_limit=1,
+    allow_concurrent_inputs=100,  # matched to pool_size + max_overflow below
     mounts=[common.mount],
 )
 @modal.asgi_app()
@@ -40,45 +155,143 @@ def api() -> FastAPI:
 
     The remaining routes are lower level (e.g. retrieving all tweets).
     """
+    import orjson
     import sqlalchemy
-    from sqlalchemy import and_, asc, delete, desc, insert, or_
-    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+    from fastapi_cache import FastAPICache
+    from fastapi_cache.backends.inmemory import InMemoryBackend
+    from fastapi_cache.decorator import cache
+    from sqlalchemy import and_, asc, bindparam, delete, desc, insert, or_, tuple_
     from sqlalchemy.future import select
-    from sqlalchemy.orm import joinedload, sessionmaker
+    from sqlalchemy.orm import joinedload, selectinload
     from sqlalchemy.sql import text
 
     import common.models as models
 
+    async def watch_pool():
+        """Ping the database every 30s to surface dead connections early.
+
+        Replaces a per-checkout pre-ping, keeping that round trip off the
+        request path."""
+        while True:
+            try:
+                async with get_engine().connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except Exception as e:
+                logging.warning(f"pool health check failed: {e}")
+            await asyncio.sleep(30)
+
+    # initialized eagerly: Modal's ASGI wrapper (0.62) never delivers lifespan
+    # events, so startup hooks placed there silently don't run in deployment.
+    # in-memory rather than Redis, since a per-container cache is coherent
+    # enough at these TTLs
+    FastAPICache.init(InMemoryBackend(), prefix="tw95")
+
+    pool_watcher = {"task": None}
+
+    @asynccontextmanager
+    async def lifespan(api: FastAPI):
+        yield
+        if pool_watcher["task"] is not None:
+            pool_watcher["task"].cancel()
+        # only reached under servers that actually run the lifespan protocol
+        await get_engine().dispose()
+
     api = FastAPI(
         title="twitter95",
         summary="What if Twitter was made in 1995?",
         version="0.1.0",
         docs_url="/",
         redoc_url=None,
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
     )
 
-    def connect():
-        user = os.environ["PGUSER"]
-        password = os.environ["PGPASSWORD"]
-        host = os.environ["PGHOST"]
-        port = os.environ["PGPORT"]
-        database = os.environ["PGDATABASE"]
-
-        connection_string = (
-            f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{database}"
+    # model_construct skips validation -- these rows come straight from the DB,
+    # so they were already validated on the way in
+    def tweet_payload(tweet) -> dict:
+        """Dump a Tweet row to a plain dict that orjson can serialize."""
+        return models.pydantic.TweetRead.model_construct(**tweet.__dict__).model_dump()
+
+    def full_tweet_payload(tweet) -> dict:
+        """Dump a Tweet row along with its author and quoted tweet."""
+        payload = tweet_payload(tweet)
+        payload["author"] = user_payload(tweet.author)
+        payload["quoted_tweet"] = (
+            full_tweet_payload(tweet.quoted_tweet)
+            if tweet.quoted_tweet is not None
+            else None
         )
-
-        engine = create_async_engine(
-            connection_string,
-            isolation_level="READ COMMITTED",  # default and lowest level in pgSQL
-            echo=True,  # log SQL as it is emitted
+        return payload
+
+    def user_payload(user) -> dict:
+        """Dump a User row to a plain dict that orjson can serialize."""
+        return models.pydantic.UserRead.model_construct(**user.__dict__).model_dump()
+
+    def window_key_builder(
+        func, namespace="", *, request=None, response=None, args=(), kwargs=None
+    ) -> str:
+        """Cache key that buckets fake_time to the minute.
+
+        Requests landing in the same minute window share a cache entry
+        instead of missing on every distinct timestamp."""
+        kwargs = kwargs or {}
+        fake_time = kwargs.get("fake_time")
+        if fake_time is not None:
+            fake_time = fake_time.replace(second=0, microsecond=0)
+        parts = (
+            # unlike default_key_builder, custom builders receive only the
+            # route namespace -- the prefix must be added by hand, or
+            # FastAPICache.clear() never matches these keys
+            FastAPICache.get_prefix(),
+            namespace,
+            func.__name__,
+            kwargs.get("user_id"),
+            fake_time,
+            kwargs.get("limit"),
+            kwargs.get("ascending"),
+            kwargs.get("cursor_fake_time"),
+            kwargs.get("cursor_tweet_id"),
         )
+        return ":".join(str(part) for part in parts)
+
+    new_session = get_session_maker()
 
-        return engine
+    def tweet_ordering(ascending: bool):
+        """ORDER BY terms matching idx_tweets_author_time, NULLs included.
 
-    engine = connect()
+        Plain DESC implies NULLS FIRST in Postgres, which disqualifies the
+        index (declared DESC NULLS LAST) from satisfying ORDER BY ... LIMIT."""
+        if ascending:
+            return (
+                models.sql.Tweet.fake_time.asc().nulls_first(),
+                models.sql.Tweet.tweet_id.asc(),
+            )
+        return (
+            models.sql.Tweet.fake_time.desc().nulls_last(),
+            models.sql.Tweet.tweet_id.desc(),
+        )
 
-    new_session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    # statements whose shape never changes, built once per container so the
+    # per-request work is just binding parameters; timeline and posts stay
+    # dynamic because their filters vary with user_id and the cursor
+    tweets_stmts = {
+        ascending: select(models.sql.Tweet)
+        .order_by(sort(models.sql.Tweet.fake_time), sort(models.sql.Tweet.tweet_id))
+        .limit(bindparam("limit"))
+        for ascending, sort in ((True, asc), (False, desc))
+    }
+    users_stmts = {
+        ascending: select(models.sql.User)
+        .order_by(sort(models.sql.User.user_id))
+        .limit(bindparam("limit"))
+        for ascending, sort in ((True, asc), (False, desc))
+    }
+    user_tweets_stmt = (
+        select(models.sql.Tweet)
+        .where(models.sql.Tweet.author_id == bindparam("user_id"))
+        .order_by(*tweet_ordering(ascending=False))
+        .limit(bindparam("limit"))
+    )
 
     api.add_middleware(
         CORSMiddleware,
@@ -88,29 +301,36 @@ def api() -> FastAPI:
         allow_headers=["*"],
     )
 
-    @api.get("/timeline/", response_model=List[models.pydantic.FullTweetRead])
+    @api.middleware("http")
+    async def start_pool_watcher(request, call_next):
+        # started from the first request rather than the lifespan, which
+        # Modal's ASGI wrapper (0.62) never invokes
+        if pool_watcher["task"] is None:
+            pool_watcher["task"] = asyncio.create_task(watch_pool())
+        return await call_next(request)
+
+    @api.get(
+        "/timeline/",
+        responses={200: {"model": List[models.pydantic.FullTweetRead]}},
+    )
+    @cache(expire=30, key_builder=window_key_builder)
     async def read_timeline(
         fake_time: Optional[datetime] = None,
         user_id: Optional[int] = None,
         limit: int = 10,
         ascending: bool = False,
+        cursor_fake_time: Optional[datetime] = None,
+        cursor_tweet_id: Optional[int] = None,
     ):
-        """Read the timeline at a specific (fake) time."""
+        """Read the timeline at a specific (fake) time.
+
+        Pass the last tweet's (fake_time, tweet_id) as the cursor to page
+        further back without OFFSET cost."""
         if fake_time is None:
             fake_time = common.to_fake(datetime.utcnow())
-        sort = asc if ascending else desc
         async with new_session() as db:
-            if user_id is not None:
-                followed_users = select(
-                    models.sql.followers_association.c.followed_id
-                ).where(models.sql.followers_association.c.follower_id == user_id)
-
             query = (
-                select(models.sql.Tweet, models.sql.User)
-                .join(
-                    models.sql.User,
-                    models.sql.Tweet.author_id == models.sql.User.user_id,
-                )
+                select(models.sql.Tweet)
                 .filter(
                     and_(
                         or_(
@@ -119,9 +339,7 @@ def api() -> FastAPI:
                         ),
                     )
                 )
-                .order_by(
-                    sort(models.sql.Tweet.fake_time), sort(models.sql.Tweet.tweet_id)
-                )
+                .order_by(*tweet_ordering(ascending))
                 .limit(limit)
                 .options(
                     joinedload(models.sql.Tweet.author),
@@ -130,37 +348,59 @@ def api() -> FastAPI:
                     ),
                 )
             )
+            if cursor_fake_time is not None and cursor_tweet_id is not None:
+                # keyset pagination: constant cost at any page depth, and it
+                # rides the (author_id, fake_time, tweet_id) index
+                keyset = tuple_(models.sql.Tweet.fake_time, models.sql.Tweet.tweet_id)
+                query = query.where(
+                    keyset > (cursor_fake_time, cursor_tweet_id)
+                    if ascending
+                    else keyset < (cursor_fake_time, cursor_tweet_id)
+                )
             if user_id is not None:
-                query = query.where(models.sql.Tweet.author_id.in_(followed_users))
+                # join the follow edges directly rather than an IN-subquery,
+                # so Postgres can push the filter through the join
+                query = query.join(
+                    models.sql.followers_association,
+                    models.sql.followers_association.c.followed_id
+                    == models.sql.Tweet.author_id,
+                ).where(models.sql.followers_association.c.follower_id == user_id)
             else:
                 query = query.where(
                     models.sql.Tweet.author_id != 3
                 )  # drop NYT bot from timeline
 
-            result = await db.execute(query)
-
-            tweets = result.scalars().all()
+            tweets = (await db.scalars(query)).all()
 
         # we only load one layer of quoted tweets; null them out
         for tweet in tweets:
             if tweet.quoted_tweet is not None:
                 tweet.quoted_tweet.quoted_tweet = None
 
-        return list(tweets)
+        # plain payloads (not Response objects) so the cache layer can store them
+        return [full_tweet_payload(tweet) for tweet in tweets]
 
-    @api.get("/posts/", response_model=List[models.pydantic.FullTweetRead])
+    @api.get(
+        "/posts/",
+        responses={200: {"model": List[models.pydantic.FullTweetRead]}},
+    )
+    @cache(expire=30, key_builder=window_key_builder)
     async def read_posts(
         user_id: int,
         fake_time: Optional[datetime] = None,
         limit: int = 10,
         ascending: bool = False,
+        cursor_fake_time: Optional[datetime] = None,
+        cursor_tweet_id: Optional[int] = None,
     ):
-        """Read a specific user's tweets at a specific (fake) time."""
+        """Read a specific user's tweets at a specific (fake) time.
+
+        Pass the last tweet's (fake_time, tweet_id) as the cursor to page
+        further back without OFFSET cost."""
         if fake_time is None:
             fake_time = common.to_fake(datetime.utcnow())
-        sort = asc if ascending else desc
         async with new_session() as db:
-            results = await db.execute(
+            query = (
                 select(models.sql.Tweet)
                 .join(
                     models.sql.User,
@@ -175,9 +415,7 @@ def api() -> FastAPI:
                     ),
                     models.sql.Tweet.author_id == user_id,
                 )
-                .order_by(
-                    sort(models.sql.Tweet.fake_time), sort(models.sql.Tweet.tweet_id)
-                )
+                .order_by(*tweet_ordering(ascending))
                 .limit(limit)
                 .options(
                     joinedload(models.sql.Tweet.author),
@@ -186,49 +424,104 @@ def api() -> FastAPI:
                     ),
                 )
             )
-            posts = results.scalars().all()
+            if cursor_fake_time is not None and cursor_tweet_id is not None:
+                keyset = tuple_(models.sql.Tweet.fake_time, models.sql.Tweet.tweet_id)
+                query = query.where(
+                    keyset > (cursor_fake_time, cursor_tweet_id)
+                    if ascending
+                    else keyset < (cursor_fake_time, cursor_tweet_id)
+                )
+            posts = (await db.scalars(query)).all()
 
         # we only load one layer of quoted tweets; null them out
         for post in posts:
             if post.quoted_tweet is not None:
                 post.quoted_tweet.quoted_tweet = None
 
-        return list(posts)
+        return [full_tweet_payload(post) for post in posts]
 
     @api.get("/profile/{user_id}/", response_model=models.pydantic.ProfileRead)
+    @cache(expire=30)
     async def read_profile(user_id: int):
         """Read the profile information of a user."""
         async with new_session() as db:
             result = await db.execute(
-                select(models.sql.User).filter_by(user_id=user_id)
+                select(models.sql.User)
+                .options(selectinload(models.sql.User.bio))
+                .filter_by(user_id=user_id)
             )
             user = result.scalar_one_or_none()
             if user is None:
                 raise fastapi.HTTPException(status_code=404, detail="User not found")
-            bio = await user.awaitable_attrs.bio
+            bio = user.bio
 
         if bio is None:
-            return models.pydantic.ProfileRead(
-                user=user,
-                bio={"user_id": user_id},
-            )
+            bio_dict = models.pydantic.BioRead(user_id=user_id).model_dump()
+        else:
+            bio_dict = models.pydantic.BioRead.model_construct(
+                **bio.__dict__
+            ).model_dump()
 
-        return {"user": user, "bio": bio}
+        return {"user": user_payload(user), "bio": bio_dict}
 
     @api.post("/tweet/", response_model=models.pydantic.TweetRead)
     async def create_tweet(tweet: models.pydantic.TweetCreate):
         """Create a new tweet."""
-        tweet = models.sql.Tweet(**tweet.dict())
+        # drop None fields so the column defaults fire, as they did under the ORM
+        values = {
+            key: value for key, value in tweet.model_dump().items() if value is not None
+        }
+
+        async with new_session() as db:
+            try:
+                result = await db.execute(
+                    insert(models.sql.Tweet).values(**values).returning(models.sql.Tweet)
+                )
+                tweet = result.scalar_one()
+                await db.commit()
+            except sqlalchemy.exc.IntegrityError as e:
+                raise fastapi.HTTPException(status_code=422, detail=f"Error: {e.orig}")
+
+        await FastAPICache.clear()  # new tweet shows up in cached reads
+
+        return models.pydantic.TweetRead.model_validate(tweet)
+
+    @api.post("/tweets/bulk/")
+    async def create_tweets(tweets: List[models.pydantic.TweetCreate]):
+        """Create many tweets at once.
+
+        One INSERT and one commit regardless of batch size; returns the new
+        tweet_ids in input order."""
+        if not tweets:
+            return {"tweet_ids": []}
+
+        # fill the timestamp defaults by hand: a multi-row VALUES needs the
+        # same columns in every row, so None fields can't simply be dropped
+        now = datetime.utcnow()
+        values = []
+        for tweet in tweets:
+            row = tweet.model_dump()
+            if row["fake_time"] is None:
+                row["fake_time"] = common.to_fake(now)
+            if row["real_time"] is None:
+                row["real_time"] = now
+            values.append(row)
 
         async with new_session() as db:
             try:
-                db.add(tweet)
+                result = await db.execute(
+                    insert(models.sql.Tweet)
+                    .values(values)
+                    .returning(models.sql.Tweet.tweet_id)
+                )
+                tweet_ids = list(result.scalars())
                 await db.commit()
-                await db.refresh(tweet)
             except sqlalchemy.exc.IntegrityError as e:
                 raise fastapi.HTTPException(status_code=422, detail=f"Error: {e.orig}")
 
-        return tweet
+        await FastAPICache.clear()  # new tweets show up in cached reads
+
+        return {"tweet_ids": tweet_ids}
 
     @api.post("/edge/")
     async def create_edge(_from: int, _to: int):
@@ -245,64 +538,73 @@ def api() -> FastAPI:
             except sqlalchemy.exc.IntegrityError as e:
                 raise fastapi.HTTPException(status_code=422, detail=f"Error: {e.orig}")
 
-    @api.get("/tweets/", response_model=List[models.pydantic.TweetRead])
-    async def read_tweets(limit=10, ascending: bool = False):
-        """Read multiple tweets."""
-        sort = asc if ascending else desc
-        async with new_session() as db:
-            result = await db.execute(
-                select(models.sql.Tweet)
-                .order_by(
-                    sort(models.sql.Tweet.fake_time), sort(models.sql.Tweet.tweet_id)
-                )
-                .limit(limit)
-            )
-            tweets = result.scalars()
-        return list(tweets)
+        await FastAPICache.clear()  # new edge changes cached timelines
+
+    @api.get("/tweets/", responses={200: {"model": List[models.pydantic.TweetRead]}})
+    async def read_tweets(limit: int = 10, ascending: bool = False):
+        """Read multiple tweets, streamed row by row."""
+        stmt = tweets_stmts[ascending]
+
+        async def stream():
+            # the generator owns the session so rows flow out while the
+            # server-side cursor is still open
+            async with new_session() as db:
+                yield b"["
+                first = True
+                async for tweet in await db.stream_scalars(stmt, {"limit": limit}):
+                    if not first:
+                        yield b","
+                    yield orjson.dumps(tweet_payload(tweet))
+                    first = False
+                yield b"]"
+
+        return StreamingResponse(stream(), media_type="application/json")
 
     @api.post("/users/", response_model=models.pydantic.UserRead)
     async def create_user(user: models.pydantic.UserCreate):
         """Create a new User."""
-        if user.bio is not None:
-            bio = models.sql.Bio(**user.bio.dict())
-            del user.bio
-        else:
-            bio = None
+        bio = user.bio
+        values = {
+            key: value
+            for key, value in user.model_dump(exclude={"bio"}).items()
+            if value is not None
+        }
         async with new_session() as db:
             try:
-                user = models.sql.User(**user.dict())
-                db.add(user)
-                await db.commit()
-                await db.refresh(user)
+                result = await db.execute(
+                    insert(models.sql.User).values(**values).returning(models.sql.User)
+                )
+                user = result.scalar_one()
                 if bio is not None:
-                    bio.user_id = user.user_id
-                    db.add(bio)
-                    await db.commit()
+                    await db.execute(
+                        insert(models.sql.Bio).values(
+                            user_id=user.user_id,
+                            **{
+                                key: value
+                                for key, value in bio.model_dump().items()
+                                if value is not None
+                            },
+                        )
+                    )
+                await db.commit()
             except sqlalchemy.exc.IntegrityError as e:
                 raise fastapi.HTTPException(status_code=422, detail=f"Error: {e.orig}")
 
-        # TODO: from_orm
-        user = models.pydantic.UserRead(**user.__dict__)
+        await FastAPICache.clear()  # new user shows up in cached reads
 
-        return user
+        return models.pydantic.UserRead.model_validate(user)
 
-    @api.get("/users/", response_model=List[models.pydantic.UserRead])
+    @api.get("/users/", responses={200: {"model": List[models.pydantic.UserRead]}})
+    @cache(expire=30)
     async def read_users(ascending: bool = False, limit: int = 10):
         """Read multiple users."""
         async with new_session() as db:
-            users = await db.scalars(
-                select(models.sql.User)
-                .order_by(
-                    models.sql.User.user_id
-                    if ascending
-                    else desc(models.sql.User.user_id)
-                )
-                .limit(limit)
-            )
+            users = await db.scalars(users_stmts[ascending], {"limit": limit})
 
-        return list(users)
+        return [user_payload(user) for user in users]
 
     @api.get("/users/{user_id}/")
+    @cache(expire=30)
     async def read_user(user_id: int) -> models.pydantic.UserRead:
         """Read a specific user"""
         async with new_session() as db:
@@ -314,50 +616,32 @@ def api() -> FastAPI:
             raise fastapi.HTTPException(
                 status_code=404, detail=f"User {user_id} not found"
             )
-        return user
+        return user_payload(user)
 
     @api.delete("/users/{user_id}/")
     async def delete_user(user_id: int):
-        """Delete a user and all their data."""
+        """Delete a user and all their data.
+
+        Tweets, follow edges, and the bio go with the user via ON DELETE CASCADE
+        (applied to existing databases by the migrate function)."""
         async with new_session() as db:
-            result = await db.execute(
-                select(models.sql.User).filter_by(user_id=user_id)
-            )
-            user = result.scalar_one_or_none()
-            if user is None:
+            try:
+                result = await db.execute(
+                    delete(models.sql.User)
+                    .where(models.sql.User.user_id == user_id)
+                    .returning(models.sql.User.user_id)
+                )
+            except sqlalchemy.exc.IntegrityError as e:
+                raise fastapi.HTTPException(status_code=422, detail=f"Error: {e.orig}")
+            deleted = result.scalar_one_or_none()
+            if deleted is None:
                 raise fastapi.HTTPException(
                     status_code=404, detail=f"User {user_id} not found"
                 )
-
-            # remove tweets
-            await db.execute(
-                delete(models.sql.Tweet).where(models.sql.Tweet.author_id == user_id)
-            )
-
-            # remove following edges
-            await db.execute(
-                delete(models.sql.followers_association).where(
-                    models.sql.followers_association.c.follower_id == user_id
-                )
-            )
-
-            # remove followed edges
-            await db.execute(
-                delete(models.sql.followers_association).where(
-                    models.sql.followers_association.c.followed_id == user_id
-                )
-            )
-
-            # remove bio
-            await db.execute(
-                delete(models.sql.Bio).where(models.sql.Bio.user_id == user_id)
-            )
-
-            # remove the user
-            await db.delete(user)
-
             await db.commit()
 
+        await FastAPICache.clear()  # drop the user from cached reads
+
     @api.delete("/tweet/{tweet_id}")
     async def delete_tweet(tweet_id: int):
         """Delete a tweet entirely.
@@ -375,32 +659,33 @@ def api() -> FastAPI:
 
             await db.commit()
 
-    @api.get("/users/{user_id}/tweets/", response_model=List[models.pydantic.TweetRead])
+        await FastAPICache.clear()  # drop the tweet from cached reads
+
+    @api.get(
+        "/users/{user_id}/tweets/",
+        responses={200: {"model": List[models.pydantic.TweetRead]}},
+    )
     async def read_user_tweets(user_id: int, limit=10):
         """Read all tweets by a user."""
         async with new_session() as db:
-            result = await db.execute(
-                select(models.sql.User).filter_by(user_id=user_id)
-            )
-            user = result.scalar_one_or_none()
-            if user is None:
-                raise fastapi.HTTPException(
-                    status_code=404, detail=f"User {user_id} not found"
-                )
-
             result = await db.scalars(
-                select(models.sql.Tweet)
-                .filter_by(author_id=user_id)
-                .order_by(
-                    desc(models.sql.Tweet.fake_time), desc(models.sql.Tweet.tweet_id)
-                )
-                .limit(limit)
+                user_tweets_stmt, {"user_id": user_id, "limit": limit}
             )
             tweets = result.all()
 
-        return list(tweets)
+            if not tweets:  # only pay for the existence check on the empty path
+                exists = await db.scalar(
+                    select(models.sql.User.user_id).filter_by(user_id=user_id)
+                )
+                if exists is None:
+                    raise fastapi.HTTPException(
+                        status_code=404, detail=f"User {user_id} not found"
+                    )
+
+        return ORJSONResponse([tweet_payload(tweet) for tweet in tweets])
 
     @api.get("/names/{user_name}/")
+    @cache(expire=30)
     async def read_user_by_name(user_name: str) -> Optional[models.pydantic.UserRead]:
         """Read a specific user by their user_name."""
         async with new_session() as db:
@@ -412,7 +697,7 @@ def api() -> FastAPI:
                 raise fastapi.HTTPException(
                     status_code=404, detail=f"User {user_name} not found"
                 )
-        return user
+        return user_payload(user)
 
     @api.post("/query/")
     async def execute_query(request: dict):